@@ -10,11 +10,13 @@ import matplotlib.pyplot as plt
 
 import streamlit as st
 import pandas as pd
-import tempfile
+import hashlib
+import io
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 import os
 import time
 from pathlib import Path
-import base64
 from main import TimeClockAnalyzer
 
 # Page configuration
@@ -24,29 +26,185 @@ st.set_page_config(
     layout="wide"
 )
 
-# Custom CSS for console-style output
-st.markdown("""
-<style>
-.console-output {
-    background-color: #1e1e1e;
-    color: #228B22;
-    font-family: 'Courier New', monospace;
-    padding: 20px;
-    border-radius: 5px;
-    height: 500px;
-    overflow-y: scroll;
-    white-space: pre-wrap;
-    font-size: 12px;
-}
-</style>
-""", unsafe_allow_html=True)
-
-def get_binary_file_downloader_html(file_path, file_label='File'):
-    """Generate download link for binary files"""
-    with open(file_path, 'rb') as f:
-        data = f.read()
-    b64 = base64.b64encode(data).decode()
-    return f'<a href="data:application/octet-stream;base64,{b64}" download="{os.path.basename(file_path)}" class="btn btn-primary">📥 Download {file_label}</a>'
+
+@st.cache_resource
+def _mpl_ready():
+    """Warm up the matplotlib Agg backend and font cache once per process.
+
+    The first figure pays the backend init and font cache scan; doing it
+    here (cached as a resource) keeps that cost out of every analyze click.
+    Drawing a text artist forces the font cache to actually populate.
+    """
+    fig = plt.figure()
+    fig.text(0.5, 0.5, 'warmup')
+    fig.canvas.draw()
+    plt.close(fig)
+    return plt
+
+
+_mpl_ready()
+
+# Content-addressed cache of generated artifacts, keyed by the SHA-256 of
+# the uploaded CSV - survives process restarts, unlike st.cache_data
+CACHE_ROOT = Path.home() / '.timeclock_cache'
+CACHE_MAX_BYTES = 1 << 30  # 1 GB
+
+
+def _evict_cache(keep_dir):
+    """LRU-evict cache entries (by mtime) until the cache fits the budget."""
+    if not CACHE_ROOT.is_dir():
+        return
+
+    entries = []
+    for entry in CACHE_ROOT.iterdir():
+        if not entry.is_dir() or entry == keep_dir:
+            continue
+        size = sum(f.stat().st_size for f in entry.iterdir() if f.is_file())
+        entries.append((entry.stat().st_mtime, size, entry))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, entry in sorted(entries):
+        if total <= CACHE_MAX_BYTES:
+            break
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= size
+
+
+@st.cache_data(show_spinner=False)
+def preview_csv(csv_head_bytes):
+    """Parse just the first rows of the CSV for the preview table.
+
+    Only the leading bytes of the file are passed in (and used as the
+    cache key), and only 10 rows are parsed, as plain strings - no
+    full-file parse or dtype inference just to show a preview.
+    """
+    return pd.read_csv(io.BytesIO(csv_head_bytes), nrows=10, dtype=str, engine='c')
+
+
+@st.cache_data(show_spinner=False)
+def parse_csv(raw):
+    """Parse the full upload once, cached on its bytes.
+
+    Both the analysis pipeline (and anything else that needs the parsed
+    frame) share this single parse.
+    """
+    return pd.read_csv(io.BytesIO(raw), dtype={'DisplayAs': 'category'})
+
+
+@st.cache_data(show_spinner=False)
+def run_analysis(csv_bytes, _progress_bar=None, _status_text=None):
+    """Run the full analysis pipeline and return (report_text, pdf_path, txt_path).
+
+    Cached on the uploaded file's bytes, so re-analyzing an identical CSV
+    (or any widget interaction that reruns the script) returns instantly.
+    Artifacts are returned as paths so downloads can stream from disk
+    instead of holding the whole PDF in memory. The progress widgets are
+    passed with a leading underscore so Streamlit excludes them from the
+    cache key.
+    """
+    def update_progress(value, text):
+        if _progress_bar is not None:
+            _progress_bar.progress(value)
+        if _status_text is not None:
+            _status_text.text(text)
+
+    # Serve straight from the on-disk cache when this exact CSV has been
+    # analyzed before (even by a previous process)
+    digest = hashlib.sha256(csv_bytes).hexdigest()
+    cache_dir = CACHE_ROOT / digest
+    cached_pdf = cache_dir / 'timeclock_detailed_heatmap.pdf'
+    cached_txt = cache_dir / 'timeclock_analysis_report.txt'
+    if cached_pdf.exists() and cached_txt.exists():
+        update_progress(100, "Loaded from cache")
+        return cached_txt.read_text(), str(cached_pdf), str(cached_txt)
+
+    update_progress(10, "Loading data...")
+
+    # Hand over the already-parsed (and cached) DataFrame - no temp file,
+    # no second parse inside the analyzer
+    analyzer = TimeClockAnalyzer.from_dataframe(parse_csv(csv_bytes))
+
+    # Load data
+    update_progress(20, "Parsing CSV data...")
+    if not analyzer.load_data():
+        raise ValueError("Failed to load data")
+
+    # Process data
+    update_progress(30, "Processing time records...")
+    if not analyzer.process_data():
+        raise ValueError("Failed to process data")
+
+    # Create periods
+    update_progress(40, "Creating analysis periods...")
+    analyzer.create_two_week_periods()
+
+    # Run analysis
+    update_progress(50, "Analyzing employee patterns...")
+
+    # Analyze each employee - categorical categories come back already
+    # sorted from pandas' C path, no Python-level sort needed, and the
+    # int codes speed up the groupby below
+    emp_col = analyzer.processed_data['employee']
+    if not isinstance(emp_col.dtype, pd.CategoricalDtype):
+        emp_col = emp_col.astype('category')
+        analyzer.processed_data['employee'] = emp_col
+    employees = emp_col.cat.categories.tolist()
+    total_employees = len(employees)
+
+    # Fail fast on malformed CSVs before spinning up the worker pool,
+    # heat map generation and the rest of the pipeline
+    if not employees:
+        raise ValueError("No employee records found in CSV.")
+
+    # Partition by employee once so workers don't re-filter the full
+    # DataFrame for every (employee, period) pair
+    groups = dict(list(analyzer.processed_data.groupby('employee', sort=False, observed=True)))
+
+    # Each (employee, period) analysis is independent, so fan the
+    # employees out across a worker pool instead of looping serially
+    def analyze_one(employee):
+        emp_data = groups.get(employee)
+        return employee, {
+            period['label']: analyzer.analyze_employee_period(employee, period, emp_data=emp_data)
+            for period in analyzer.two_week_periods
+        }
+
+    # Build the results dict in one pass and bulk-assign it, rather
+    # than mutating analyzer.analysis_results[employee][label] through
+    # two dict lookups per (employee, period)
+    analysis_results = {}
+    # Each progress update is a websocket round-trip, so throttle to
+    # at most ~20 updates instead of one per employee
+    update_every = max(1, total_employees // 20)
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for idx, (employee, results) in enumerate(executor.map(analyze_one, employees)):
+            analysis_results[employee] = results
+
+            # Update progress
+            if idx % update_every == 0 or idx == total_employees - 1:
+                progress = 50 + int((idx + 1) / total_employees * 30)
+                update_progress(progress, f"Analyzing employees... ({idx + 1}/{total_employees})")
+    analyzer.analysis_results = analysis_results
+
+    # Generate visualizations
+    update_progress(85, "Generating heat maps...")
+
+    # Generate files into the persistent content-addressed cache so the
+    # download buttons can stream them from disk and a repeat analysis of
+    # the same CSV (even after a restart) is free
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # Generate files (output paths are passed explicitly -
+    # os.chdir is process-global and unsafe across sessions)
+    analyzer.generate_heat_map(output_dir=str(cache_dir))
+    report_text = analyzer.generate_report(output_dir=str(cache_dir))
+    _evict_cache(keep_dir=cache_dir)
+
+    update_progress(100, "Analysis complete!")
+    return (
+        report_text,
+        str(cached_pdf) if cached_pdf.exists() else None,
+        str(cached_txt) if cached_txt.exists() else None
+    )
 
 def main():
     # Header
@@ -94,21 +252,14 @@ def main():
     )
     
     if uploaded_file is not None:
-        # Display file info
-        st.success(f"✅ File uploaded: {uploaded_file.name}")
-        file_details = {
-            "Filename": uploaded_file.name,
-            "File size": f"{uploaded_file.size:,} bytes",
-            "File type": uploaded_file.type
-        }
-        st.json(file_details)
+        # Display file info (one element - every st.* call here re-fires
+        # on each rerun triggered by any widget in the session)
+        st.success(f"✅ {uploaded_file.name} ({uploaded_file.size:,} bytes, {uploaded_file.type})")
         
         # Preview data
         if st.checkbox("Preview data (first 10 rows)"):
             try:
-                df = pd.read_csv(uploaded_file)
-                st.dataframe(df.head(10))
-                uploaded_file.seek(0)  # Reset file pointer
+                st.dataframe(preview_csv(uploaded_file.getvalue()[:65536]))
             except Exception as e:
                 st.error(f"Error reading CSV: {str(e)}")
         
@@ -122,118 +273,69 @@ def main():
                     status_text = st.empty()
                 
                 try:
-                    # Save uploaded file temporarily
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.csv') as tmp_file:
-                        tmp_file.write(uploaded_file.getvalue())
-                        tmp_file_path = tmp_file.name
-                    
-                    # Update progress
-                    progress_bar.progress(10)
-                    status_text.text("Loading data...")
-                    
-                    # Initialize analyzer
-                    analyzer = TimeClockAnalyzer(tmp_file_path)
-                    
-                    # Load data
-                    progress_bar.progress(20)
-                    status_text.text("Parsing CSV data...")
-                    if not analyzer.load_data():
-                        st.error("Failed to load data")
-                        return
-                    
-                    # Process data
-                    progress_bar.progress(30)
-                    status_text.text("Processing time records...")
-                    if not analyzer.process_data():
-                        st.error("Failed to process data")
-                        return
-                    
-                    # Create periods
-                    progress_bar.progress(40)
-                    status_text.text("Creating analysis periods...")
-                    analyzer.create_two_week_periods()
-                    
-                    # Run analysis
-                    progress_bar.progress(50)
-                    status_text.text("Analyzing employee patterns...")
-                    
-                    # Analyze each employee
-                    employees = sorted(analyzer.processed_data['employee'].unique())
-                    total_employees = len(employees)
-                    
-                    for idx, employee in enumerate(employees):
-                        analyzer.analysis_results[employee] = {}
-                        for period in analyzer.two_week_periods:
-                            result = analyzer.analyze_employee_period(employee, period)
-                            analyzer.analysis_results[employee][period['label']] = result
-                        
-                        # Update progress
-                        progress = 50 + int((idx + 1) / total_employees * 30)
-                        progress_bar.progress(progress)
-                        status_text.text(f"Analyzing employees... ({idx + 1}/{total_employees})")
-                    
-                    # Generate visualizations
-                    progress_bar.progress(85)
-                    status_text.text("Generating heat maps...")
-                    
-                    # Generate files in temp directory
-                    with tempfile.TemporaryDirectory() as temp_dir:
-                        # Change to temp directory
-                        original_dir = os.getcwd()
-                        os.chdir(temp_dir)
-                        
-                        # Generate files
-                        analyzer.generate_heat_map()
-                        report_text = analyzer.generate_report()
-                        
-                        # Update progress
-                        progress_bar.progress(100)
-                        status_text.text("Analysis complete!")
-                        time.sleep(0.5)  # Brief pause to show completion
-                        
-                        # Clear progress indicators
-                        progress_container.empty()
-                        
-                        # Success message
-                        st.success("✅ Analysis completed successfully!")
-                        
-                        # Display results in two columns
-                        result_col1, result_col2 = st.columns([3, 1])
-                        
-                        with result_col1:
-                            st.header("📊 Analysis Report")
-                            # Display report in console style
-                            st.markdown(
-                                f'<div class="console-output">{report_text}</div>',
-                                unsafe_allow_html=True
+                    # Run the (cached) analysis pipeline
+                    csv_bytes = uploaded_file.getvalue()
+                    report_text, pdf_path, txt_path = run_analysis(
+                        csv_bytes,
+                        _progress_bar=progress_bar,
+                        _status_text=status_text
+                    )
+                    # The memoized tuple holds paths into the on-disk
+                    # cache, which eviction (triggered by analyzing other
+                    # CSVs) may have deleted since - drop the stale memo
+                    # and regenerate rather than serving dead paths
+                    if ((pdf_path is not None and not os.path.exists(pdf_path)) or
+                            (txt_path is not None and not os.path.exists(txt_path))):
+                        run_analysis.clear()
+                        report_text, pdf_path, txt_path = run_analysis(
+                            csv_bytes,
+                            _progress_bar=progress_bar,
+                            _status_text=status_text
+                        )
+                    time.sleep(0.5)  # Brief pause to show completion
+
+                    # Clear progress indicators
+                    progress_container.empty()
+
+                    # Success message
+                    st.success("✅ Analysis completed successfully!")
+
+                    # Display results in two columns
+                    result_col1, result_col2 = st.columns([3, 1])
+
+                    with result_col1:
+                        st.header("📊 Analysis Report")
+                        # st.code renders in a native <pre> block that the
+                        # browser can layer-cache, with no HTML sanitizer
+                        # pass over the (potentially large) report string
+                        st.code(report_text, language=None)
+
+                    with result_col2:
+                        st.header("📥 Download Results")
+
+                        # Hand download_button open file objects so the
+                        # artifacts are streamed from disk, never fully
+                        # materialized in the Python process
+                        if pdf_path is not None:
+                            st.download_button(
+                                "📥 Download Heat Map (PDF)",
+                                open(pdf_path, 'rb'),
+                                file_name="timeclock_detailed_heatmap.pdf",
+                                mime="application/pdf"
+                            )
+
+                        if txt_path is not None:
+                            st.download_button(
+                                "📥 Download Analysis Report (TXT)",
+                                open(txt_path, 'rb'),
+                                file_name="timeclock_analysis_report.txt",
+                                mime="text/plain"
                             )
-                        
-                        with result_col2:
-                            st.header("📥 Download Results")
-                            
-                            # Check if files exist
-                            pdf_path = os.path.join(temp_dir, 'timeclock_detailed_heatmap.pdf')
-                            txt_path = os.path.join(temp_dir, 'timeclock_analysis_report.txt')
-                            
-                            if os.path.exists(pdf_path):
-                                st.markdown(get_binary_file_downloader_html(
-                                    pdf_path, 
-                                    'Heat Map (PDF)'
-                                ), unsafe_allow_html=True)
-                                st.markdown("<br>", unsafe_allow_html=True)
-                            
-                            if os.path.exists(txt_path):
-                                st.markdown(get_binary_file_downloader_html(
-                                    txt_path, 
-                                    'Analysis Report (TXT)'
-                                ), unsafe_allow_html=True)
-                        
-                        # Change back to original directory
-                        os.chdir(original_dir)
-                    
-                    # Clean up temp CSV
-                    os.unlink(tmp_file_path)
-                    
+
+                except ValueError as e:
+                    # Bad input data, not a bug - no traceback needed
+                    progress_container.empty()
+                    st.warning(f"⚠️ {str(e)}")
                 except Exception as e:
                     progress_container.empty()
                     st.error(f"❌ Error during analysis: {str(e)}")
@@ -10,24 +10,142 @@ import pandas as pd
 import numpy as np
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend for lower memory
+matplotlib.rcParams['path.simplify'] = True  # Faster Agg path rendering
+matplotlib.rcParams['agg.path.chunksize'] = 10000
 import matplotlib.pyplot as plt
+from matplotlib import colors as mcolors
+from matplotlib.collections import LineCollection, PolyCollection
 import seaborn as sns
 from datetime import datetime, timedelta
 from collections import defaultdict
-import gc
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from threading import Lock
+import hashlib
 import os
 from PyPDF2 import PdfMerger
-import warnings
-warnings.filterwarnings('ignore')
+
+# Per-process figure reused across heat map pages: figure creation and
+# teardown (rc resolution, canvas setup) is paid once per worker instead
+# of once per page. fig.clear() wipes axes, legend and page-number text.
+_PAGE_FIG = None
+
+# Process-wide memo of per-(employee, period) analysis results, keyed by a
+# content hash of the rows analyzed. Re-running after minor CSV edits (or a
+# re-upload of the same file) skips employees whose rows didn't change.
+_PERIOD_CACHE = {}
+_PERIOD_CACHE_MAX = 4096
+# Guards the check-then-pop eviction: the Streamlit path drives the
+# analysis through a thread pool, and two threads racing the eviction
+# could otherwise pop the same oldest key
+_PERIOD_CACHE_LOCK = Lock()
+
+# Cell color palette. Classification stores int8 indices into this tuple
+# (1 byte per cell instead of a ~56B hex string object); the page renderer
+# resolves indices to hex only at draw time.
+PALETTE = ('#F8F8F8', '#D3D3D3', '#FFB6C1', '#228B22', '#DAA520',
+           '#FF6600', '#DC143C', '#9932CC')
+DEFAULT_IDX = 0   # Missing data
+ABSENT_IDX = 1    # Absent day (gray)
+FLAGGED_IDX = 2   # Multiple punches (pink)
+SEVERITY_IDX = 3  # First severity bucket (green); buckets occupy 3..6
+PURPLE_IDX = 7    # Missed out punch
+
+# Severity buckets for punch-time deviations (minutes):
+# <=5 green (acceptable), <=7 yellow (minor), <=11 orange (major), else red
+SEVERITY_BINS = np.array([5, 7, 11])
+
+# Text color per cell background (dark text on light backgrounds, white
+# on saturated ones); single dict lookup instead of an if/elif chain per
+# cell. Anything unmapped gets the medium-gray missing-data text.
+TEXT_COLOR_FOR_BG = {
+    '#228B22': '#2C3E50',  # Green: Acceptable
+    '#DAA520': '#2C3E50',  # Yellow: Minor Delay
+    '#FF6600': 'white',    # Orange: Major Delay
+    '#DC143C': 'white',    # Red: Significant Delay
+    '#9932CC': 'white',    # Purple: Missed Out Punch
+    '#FFB6C1': '#495057',  # Pink: Multiple punches flagged
+    '#D3D3D3': '#6C757D',  # Gray: Absent days
+}
+
+# Same mapping for the total-hours column backgrounds
+HOURS_TEXT_COLOR = {
+    '#2c67dc': 'white',    # Blue: overtime
+    '#9247d5': 'white',    # Purple: under-hours
+    '#D3D3D3': '#6C757D',  # Gray: absent
+    '#FFFFFF': '#2C3E50',  # White: normal hours
+}
+
+
+def _severity_indices(diffs):
+    """Map an array of minute deviations to int8 palette indices."""
+    return (np.searchsorted(SEVERITY_BINS, diffs, side='left') + SEVERITY_IDX).astype(np.int8)
+
+
+def describe_anomaly(anomaly):
+    """Format an anomaly's human-readable description on demand.
+
+    Anomaly dicts carry only their raw payload (type, date, punch string,
+    minute counts); nothing in the pipeline displays descriptions, so the
+    f-string work is deferred until a caller actually asks for one.
+    """
+    kind = anomaly['type']
+    if kind == 'missed_day':
+        return f"Missed entire work day on {anomaly['date'].strftime('%m/%d/%y')}"
+    if kind == 'date_mismatch':
+        return f"Punch dates don't match: {anomaly['in_date']} vs {anomaly['out_date']}"
+    if kind == 'incomplete_day':
+        return f"Only one punch pair on {anomaly['date'].strftime('%m/%d/%y')}"
+    if kind == 'late_arrival':
+        return f"Late arrival: {anomaly['time']} ({anomaly['minutes_late']} min late)"
+    if kind == 'irregular_lunch_departure':
+        return f"Irregular lunch departure: {anomaly['time']}"
+    if kind == 'late_lunch_return':
+        return f"Late lunch return: {anomaly['time']} ({anomaly['minutes_late']} min late)"
+    if kind == 'irregular_end_time':
+        return f"Irregular end time: {anomaly['time']}"
+    if kind == 'extra_punches':
+        return f"Extra punch pairs ({anomaly['extra_pairs']}) indicating additional breaks"
+    return kind
+
 
 class TimeClockAnalyzer:
-    def __init__(self, csv_file_path):
-        """Initialize the analyzer with time clock data."""
+    # Shared minutes -> 'H:MM AM/PM' table, built on first use
+    _MINUTES_TO_TIME = None
+
+    # Legend handles for page 1, built on first use and reused - the
+    # Rectangle patches are stateless proxies for legend keying, so
+    # sharing them across figures (and runs) is safe
+    _LEGEND_HANDLES = None
+
+    def __init__(self, csv_file_path, read_csv_kwargs=None):
+        """Initialize the analyzer with time clock data.
+
+        csv_file_path may be a filesystem path or any file-like object
+        (e.g. io.BytesIO) - it is handed to pd.read_csv as-is, so callers
+        that already hold the CSV in memory can skip the disk round-trip.
+        """
         self.csv_file_path = csv_file_path
+        self.read_csv_kwargs = read_csv_kwargs or {}
         self.data = None
         self.processed_data = None
         self.two_week_periods = []
         self.analysis_results = {}
+        self.scores_df = None
+
+        # Axis caches filled by process_data and shared downstream
+        self.employees = []
+        self.all_dates = []
+        self.day_keys = []
+
+        # Per-employee indexes built lazily: sorted date array plus a
+        # date -> day-frame map, so period slicing is a binary search
+        # instead of a full-frame boolean filter
+        self._emp_dates = {}
+        self._emp_ordinals = {}
+        self._emp_day_groups = {}
+        self._emp_daily = {}
+        self._emp_hash = {}
         
         # Standard schedule parameters (in minutes from midnight)
         self.EXPECTED_MORNING_ARRIVAL = 8 * 60  # 8:00 AM
@@ -38,40 +156,94 @@ class TimeClockAnalyzer:
         
         # Buffer windows (in minutes)
         self.BUFFER_MINUTES = 7
-        
+
+    @classmethod
+    def from_dataframe(cls, data):
+        """Build an analyzer from an already-parsed punch DataFrame.
+
+        Lets callers that parsed (and possibly cached) the CSV themselves
+        hand the DataFrame over without a second parse; load_data becomes
+        a no-op for the parsing step.
+        """
+        analyzer = cls('<DataFrame>')
+        analyzer.data = data
+        return analyzer
+
     def load_data(self):
-        """Load and parse the CSV time clock data."""
+        """Load and parse the CSV time clock data (from a path or buffer)."""
         try:
-            self.data = pd.read_csv(self.csv_file_path)
+            if self.data is None:
+                try:
+                    # pyarrow's multithreaded CSV reader is several times
+                    # faster than the default C engine when it's installed
+                    self.data = pd.read_csv(
+                        self.csv_file_path, engine='pyarrow', **self.read_csv_kwargs
+                    )
+                except (ImportError, ValueError):
+                    self.data = pd.read_csv(self.csv_file_path, **self.read_csv_kwargs)
+            self._vectorize_times()
             print(f"Loaded {len(self.data)} punch records")
             return True
-        except Exception as e:
+        except (OSError, ValueError, KeyError) as e:
             print(f"Error loading data: {e}")
             return False
-    
+
+    def _vectorize_times(self):
+        """Parse the InTime/OutTime columns to minutes from midnight.
+
+        One vectorized pass over each column (regex extract + integer
+        arithmetic) instead of a Python-level time_to_minutes call per
+        row. Unparseable values come out as NA in the nullable Int16
+        result columns.
+        """
+        for src, dest in (('InTime', 'in_time_minutes'), ('OutTime', 'out_time_minutes')):
+            parts = self.data[src].astype(str).str.strip().str.lower().str.extract(
+                r'^(\d{1,2}):(\d{2})([ap])$', expand=True
+            )
+            hours = pd.to_numeric(parts[0], errors='coerce').astype('Int16')
+            minutes = pd.to_numeric(parts[1], errors='coerce').astype('Int16')
+            suffix = parts[2]
+
+            is_pm = (suffix == 'p') & (hours != 12)
+            is_am12 = (suffix == 'a') & (hours == 12)
+            hours = hours.mask(is_pm, hours + 12).mask(is_am12, 0)
+
+            self.data[dest] = hours * 60 + minutes
+
     def time_to_minutes(self, time_str):
-        """Convert time string (e.g., '07:54a') to minutes from midnight."""
+        """Convert time string (e.g., '07:54a') to minutes from midnight.
+
+        Scalar fallback for callers outside the vectorized load path.
+        The AM/PM adjustment is pure arithmetic - hours mod 12 plus a
+        12-hour offset when the suffix is 'p' - covering both the 12 AM
+        and 12 PM wraparounds without branching.
+        """
         try:
             time_str = time_str.strip().lower()
-            if time_str.endswith('a') or time_str.endswith('p'):
-                am_pm = time_str[-1]
-                time_part = time_str[:-1]
-            else:
+            suffix = time_str[-1]
+            if suffix != 'a' and suffix != 'p':
                 return None
-                
-            hours, minutes = map(int, time_part.split(':'))
-            
-            if am_pm == 'p' and hours != 12:
-                hours += 12
-            elif am_pm == 'a' and hours == 12:
-                hours = 0
-                
-            return hours * 60 + minutes
-        except:
+            hours, minutes = map(int, time_str[:-1].split(':'))
+            return (hours % 12 + 12 * (suffix == 'p')) * 60 + minutes
+        except (AttributeError, ValueError, IndexError):
             return None
     
     def minutes_to_time(self, minutes):
-        """Convert minutes from midnight to readable time string."""
+        """Convert minutes from midnight to readable time string.
+
+        Only 1440 distinct inputs exist, so results are formatted once
+        and served from a lazily built class-level lookup table.
+        """
+        table = TimeClockAnalyzer._MINUTES_TO_TIME
+        if table is None:
+            table = TimeClockAnalyzer._MINUTES_TO_TIME = [
+                self._format_minutes(m) for m in range(1440)
+            ]
+        return table[minutes % 1440]
+
+    @staticmethod
+    def _format_minutes(minutes):
+        """Format minutes from midnight as e.g. '7:54 AM' (uncached)."""
         hours = minutes // 60
         mins = minutes % 60
         am_pm = 'AM' if hours < 12 else 'PM'
@@ -87,34 +259,76 @@ class TimeClockAnalyzer:
         """Process raw data into structured format for analysis."""
         if self.data is None:
             return False
-            
-        processed_records = []
-        
-        for _, row in self.data.iterrows():
-            try:
-                # Parse date
-                date_obj = datetime.strptime(row['InDate'], '%m/%d/%y').date()
-                
-                record = {
-                    'employee': row['DisplayAs'],
-                    'date': date_obj,
-                    'day_of_week': row['InDow'],
-                    'in_time_str': row['InTime'],
-                    'out_time_str': row['OutTime'],
-                    'in_time_minutes': self.time_to_minutes(row['InTime']),
-                    'out_time_minutes': self.time_to_minutes(row['OutTime']),
-                    'in_date': row['InDate'],
-                    'out_date': row['OutDate']
-                }
-                
-                if record['in_time_minutes'] is not None and record['out_time_minutes'] is not None:
-                    processed_records.append(record)
-                    
-            except Exception as e:
-                print(f"Error processing row: {e}")
-                continue
-        
-        self.processed_data = pd.DataFrame(processed_records)
+
+        # Work entirely on columns: rename into the target schema, parse
+        # all dates in one to_datetime call (explicit format keeps the C
+        # fast path; cache=True dedupes repeated date strings), then drop
+        # invalid rows with a single boolean mask
+        df = self.data.rename(columns={
+            'DisplayAs': 'employee',
+            'InDow': 'day_of_week',
+            'InTime': 'in_time_str',
+            'OutTime': 'out_time_str',
+            'InDate': 'in_date',
+            'OutDate': 'out_date'
+        })
+        parsed = pd.to_datetime(
+            df['in_date'], format='%m/%d/%y', errors='coerce', cache=True
+        )
+        df['date'] = parsed.dt.date
+        # Proleptic date ordinals as int32 (1970-01-01 is ordinal 719163):
+        # period slicing and missed-day set ops run on packed integers
+        # instead of boxed date objects
+        # .dt.days is resolution-independent (to_datetime may back the
+        # result with ns or us depending on the pandas version); NaT rows
+        # get a placeholder and are dropped by the validity mask below
+        df['date_ord'] = (
+            (parsed - pd.Timestamp(1970, 1, 1)).dt.days + 719163
+        ).fillna(0).astype(np.int32)
+
+        mask = (
+            df['in_time_minutes'].notna() &
+            df['out_time_minutes'].notna() &
+            df['date'].notna()
+        )
+        columns = ['employee', 'date', 'date_ord', 'day_of_week', 'in_time_str', 'out_time_str',
+                   'in_time_minutes', 'out_time_minutes', 'in_date', 'out_date']
+        self.processed_data = df.loc[mask, columns].reset_index(drop=True)
+
+        # Every surviving row has both punch times, so pack the nullable
+        # Int16 columns down to plain int16 - drops the validity-mask
+        # arrays and gives downstream to_numpy() calls a zero-copy view
+        for col in ('in_time_minutes', 'out_time_minutes'):
+            self.processed_data[col] = self.processed_data[col].astype(np.int16)
+
+        # Dictionary-encode the low-cardinality string columns: employee
+        # comparisons and groupbys then run on small int codes instead of
+        # hashing/comparing Python strings
+        for col in ('employee', 'day_of_week'):
+            self.processed_data[col] = self.processed_data[col].astype('category')
+
+        # Same for the raw punch-date strings, with one shared category
+        # set so the in_date != out_date mismatch compares run on the
+        # integer codes rather than string pairs
+        punch_date_dtype = pd.CategoricalDtype(
+            pd.unique(pd.concat(
+                [self.processed_data['in_date'], self.processed_data['out_date']],
+                ignore_index=True
+            ))
+        )
+        for col in ('in_date', 'out_date'):
+            self.processed_data[col] = self.processed_data[col].astype(punch_date_dtype)
+
+        # Cache the employee and date axes (and the formatted day labels)
+        # once; run_analysis and the heat map builder reuse these instead
+        # of recomputing sorted uniques and strftime calls
+        self.employees = self.processed_data['employee'].cat.categories.tolist()
+        self.all_dates = sorted(self.processed_data['date'].unique())
+        dates_idx = pd.DatetimeIndex(self.all_dates)
+        self.day_keys = [
+            f"{md} ({dow})"
+            for md, dow in zip(dates_idx.strftime('%m/%d'), dates_idx.strftime('%a'))
+        ]
         print(f"Processed {len(self.processed_data)} valid records")
         return True
     
@@ -135,25 +349,68 @@ class TimeClockAnalyzer:
         periods = []
         while current_date <= max_date:
             period_end = current_date + timedelta(days=13)  # 2 weeks
+            # Expected Mon-Fri workdays as date ordinals (ordinal 1 is a
+            # Monday), computed once here rather than per employee
+            ordinals = np.arange(current_date.toordinal(), period_end.toordinal() + 1)
             periods.append({
                 'start': current_date,
                 'end': period_end,
-                'label': f"{current_date.strftime('%m/%d')} - {period_end.strftime('%m/%d')}"
+                'label': f"{current_date.strftime('%m/%d')} - {period_end.strftime('%m/%d')}",
+                'expected_ordinals': ordinals[(ordinals - 1) % 7 < 5]
             })
             current_date += timedelta(days=14)
             
         self.two_week_periods = periods
         print(f"Created {len(periods)} two-week periods")
     
-    def analyze_employee_period(self, employee, period):
-        """Analyze a specific employee for a specific 2-week period."""
-        period_data = self.processed_data[
-            (self.processed_data['employee'] == employee) &
-            (self.processed_data['date'] >= period['start']) &
-            (self.processed_data['date'] <= period['end'])
-        ].copy()
-        
-        if len(period_data) == 0:
+    def analyze_employee_period(self, employee, period, emp_data=None):
+        """Analyze a specific employee for a specific 2-week period.
+
+        Callers iterating many employees should pass the employee's
+        pre-sliced sub-frame as emp_data (e.g. from one groupby) so the
+        full DataFrame isn't re-scanned per (employee, period) pair.
+        """
+        # Index this employee's punches by date once; subsequent periods
+        # reuse it and slice with a binary search on the sorted date array
+        if employee not in self._emp_day_groups:
+            if emp_data is None:
+                emp_data = self.processed_data[self.processed_data['employee'] == employee]
+            emp_data = emp_data.sort_values(['date', 'in_time_minutes'])
+            day_groups = dict(list(emp_data.groupby('date')))
+            self._emp_day_groups[employee] = day_groups
+            self._emp_dates[employee] = np.array(sorted(day_groups.keys()))
+            # Sorted unique ordinals align 1:1 with the sorted date array
+            self._emp_ordinals[employee] = np.unique(emp_data['date_ord'].to_numpy())
+            # Content hash of the employee's rows, computed once here;
+            # the per-period memo keys off it below
+            self._emp_hash[employee] = hashlib.blake2b(
+                pd.util.hash_pandas_object(emp_data, index=False).to_numpy().tobytes(),
+                digest_size=16
+            ).hexdigest()
+
+            # Per-day aggregates (first/last punch pair, punch count,
+            # date mismatches) feeding the vectorized anomaly masks
+            mismatch = emp_data['in_date'] != emp_data['out_date']
+            self._emp_daily[employee] = emp_data.assign(mismatches=mismatch).groupby('date').agg(
+                first_in=('in_time_minutes', 'first'),
+                first_out=('out_time_minutes', 'first'),
+                first_in_str=('in_time_str', 'first'),
+                first_out_str=('out_time_str', 'first'),
+                last_in=('in_time_minutes', 'last'),
+                last_out=('out_time_minutes', 'last'),
+                last_in_str=('in_time_str', 'last'),
+                last_out_str=('out_time_str', 'last'),
+                punches=('in_time_minutes', 'size'),
+                mismatches=('mismatches', 'sum')
+            )
+
+        day_groups = self._emp_day_groups[employee]
+        dates = self._emp_dates[employee]
+        lo = np.searchsorted(dates, period['start'])
+        hi = np.searchsorted(dates, period['end'], side='right')
+        period_dates = dates[lo:hi]
+
+        if len(period_dates) == 0:
             return {
                 'employee': employee,
                 'period': period['label'],
@@ -163,139 +420,181 @@ class TimeClockAnalyzer:
                 'worked_days': 0,
                 'missed_days': 0
             }
-        
-        # Group by date to analyze daily patterns
-        daily_groups = period_data.groupby('date')
+
+        # Memoize on the employee's content hash (computed once when the
+        # index was built) - identical (employee, period, rows)
+        # subproblems recur across re-uploads
+        cache_key = (employee, period['start'], period['end'], self._emp_hash[employee])
+        cached = _PERIOD_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
         anomalies = []
-        
-        # Calculate expected work days (Monday-Friday) in period
-        expected_days = []
-        current_date = period['start']
-        while current_date <= period['end']:
-            if current_date.weekday() < 5:  # Monday=0, Friday=4
-                expected_days.append(current_date)
-            current_date += timedelta(days=1)
-        
-        worked_days = len(daily_groups)
-        missed_days = len(expected_days) - worked_days
-        
+
+        # Expected workdays were computed once per period when the
+        # periods were built; the missed-day check stays one sorted-array
+        # difference against this employee's worked ordinals
+        expected_ordinals = period['expected_ordinals']
+        worked_ordinals = self._emp_ordinals[employee][lo:hi]
+
+        worked_days = len(period_dates)
+        missed_days = len(expected_ordinals) - worked_days
+
         # Check for missed days
-        worked_dates = set(daily_groups.groups.keys())
-        for expected_date in expected_days:
-            if expected_date not in worked_dates:
-                anomalies.append({
-                    'type': 'missed_day',
-                    'date': expected_date,
-                    'severity': 'high',
-                    'description': f"Missed entire work day on {expected_date.strftime('%m/%d/%y')}"
-                })
+        for ordinal in np.setdiff1d(expected_ordinals, worked_ordinals, assume_unique=True):
+            missed_date = datetime.fromordinal(int(ordinal)).date()
+            anomalies.append({
+                'type': 'missed_day',
+                'date': missed_date,
+                'severity': 'high'
+            })
         
-        # Analyze each worked day
-        for date, day_data in daily_groups:
-            day_data = day_data.sort_values('in_time_minutes')
-            day_records = day_data.to_dict('records')
-            
-            # Check for date mismatches
-            for record in day_records:
-                if record['in_date'] != record['out_date']:
-                    anomalies.append({
-                        'type': 'date_mismatch',
-                        'date': date,
-                        'severity': 'medium',
-                        'description': f"Punch dates don't match: {record['in_date']} vs {record['out_date']}"
-                    })
-            
-            # Analyze daily punch patterns
-            if len(day_records) == 1:
-                # Only one punch pair - incomplete day
+        n_missed = len(anomalies)  # Only missed-day entries exist so far
+
+        # Vectorized per-day anomaly checks: the threshold comparisons run
+        # as C-level array ops over the daily aggregates, and anomaly
+        # dicts are materialized only for the days a mask actually flags
+        daily = self._emp_daily[employee].iloc[lo:hi]
+        punches = daily['punches'].to_numpy()
+        first_in = daily['first_in'].to_numpy(dtype=np.int32)
+        first_out = daily['first_out'].to_numpy(dtype=np.int32)
+        last_in = daily['last_in'].to_numpy(dtype=np.int32)
+        last_out = daily['last_out'].to_numpy(dtype=np.int32)
+        mismatches = daily['mismatches'].to_numpy()
+        first_in_str = daily['first_in_str'].to_numpy()
+        first_out_str = daily['first_out_str'].to_numpy()
+        last_in_str = daily['last_in_str'].to_numpy()
+        last_out_str = daily['last_out_str'].to_numpy()
+
+        incomplete = punches == 1
+        extra = punches > 2
+
+        # Bind the schedule constants to locals once for the threshold
+        # block below - each is read several times and a local load beats
+        # a repeated attribute lookup on self
+        morning_arrival = self.EXPECTED_MORNING_ARRIVAL
+        lunch_departure = self.EXPECTED_LUNCH_DEPARTURE
+        lunch_return = self.EXPECTED_LUNCH_RETURN
+        end_time_1 = self.EXPECTED_END_TIME_1
+        end_time_2 = self.EXPECTED_END_TIME_2
+        buffer_minutes = self.BUFFER_MINUTES
+
+        # Check for date mismatches (any punch pair with InDate != OutDate)
+        for i in np.nonzero(mismatches > 0)[0]:
+            date = period_dates[i]
+            day_data = day_groups[date]
+            in_dates = day_data['in_date'].to_numpy()
+            out_dates = day_data['out_date'].to_numpy()
+            bad = np.nonzero(in_dates != out_dates)[0]
+            for in_d, out_d in zip(in_dates[bad], out_dates[bad]):
                 anomalies.append({
-                    'type': 'incomplete_day',
+                    'type': 'date_mismatch',
                     'date': date,
                     'severity': 'medium',
-                    'description': f"Only one punch pair on {date.strftime('%m/%d/%y')}"
-                })
-            elif len(day_records) == 2:
-                # Standard two punch pairs - check timing
-                morning_record = day_records[0]
-                afternoon_record = day_records[1]
-                
-                # Check morning arrival
-                if morning_record['in_time_minutes'] > self.EXPECTED_MORNING_ARRIVAL + self.BUFFER_MINUTES:
-                    late_minutes = morning_record['in_time_minutes'] - self.EXPECTED_MORNING_ARRIVAL
-                    anomalies.append({
-                        'type': 'late_arrival',
-                        'date': date,
-                        'severity': 'medium',
-                        'description': f"Late arrival: {morning_record['in_time_str']} ({late_minutes} min late)",
-                        'minutes_late': late_minutes
-                    })
-                
-                # Check lunch departure timing
-                lunch_out_time = morning_record['out_time_minutes']
-                if abs(lunch_out_time - self.EXPECTED_LUNCH_DEPARTURE) > self.BUFFER_MINUTES:
-                    anomalies.append({
-                        'type': 'irregular_lunch_departure',
-                        'date': date,
-                        'severity': 'low',
-                        'description': f"Irregular lunch departure: {morning_record['out_time_str']}"
-                    })
-                
-                # Check lunch return timing
-                lunch_return_time = afternoon_record['in_time_minutes']
-                if lunch_return_time > self.EXPECTED_LUNCH_RETURN + self.BUFFER_MINUTES:
-                    late_minutes = lunch_return_time - self.EXPECTED_LUNCH_RETURN
-                    anomalies.append({
-                        'type': 'late_lunch_return',
-                        'date': date,
-                        'severity': 'medium',
-                        'description': f"Late lunch return: {afternoon_record['in_time_str']} ({late_minutes} min late)",
-                        'minutes_late': late_minutes
-                    })
-                
-                # Check end time
-                end_time = afternoon_record['out_time_minutes']
-                end_time_valid = (
-                    abs(end_time - self.EXPECTED_END_TIME_1) <= self.BUFFER_MINUTES or
-                    abs(end_time - self.EXPECTED_END_TIME_2) <= self.BUFFER_MINUTES
-                )
-                
-                if not end_time_valid:
-                    anomalies.append({
-                        'type': 'irregular_end_time',
-                        'date': date,
-                        'severity': 'low',
-                        'description': f"Irregular end time: {afternoon_record['out_time_str']}"
-                    })
-            
-            elif len(day_records) > 2:
-                # Extra punch pairs - additional breaks
-                extra_punches = len(day_records) - 2
-                anomalies.append({
-                    'type': 'extra_punches',
-                    'date': date,
-                    'severity': 'low',
-                    'description': f"Extra punch pairs ({extra_punches}) indicating additional breaks"
+                    'in_date': in_d,
+                    'out_date': out_d
                 })
-        
-        # Calculate anomaly score
-        score = 0
-        for anomaly in anomalies:
-            if anomaly['severity'] == 'high':
-                score += 10
-            elif anomaly['severity'] == 'medium':
-                score += 5
-            else:  # low
-                score += 2
-        
-        return {
+
+        # Only one punch pair - incomplete day
+        for i in np.nonzero(incomplete)[0]:
+            date = period_dates[i]
+            anomalies.append({
+                'type': 'incomplete_day',
+                'date': date,
+                'severity': 'medium'
+            })
+
+        # Standard two punch pairs - check timing
+        two_pairs = punches == 2
+
+        # Check morning arrival
+        late_arrival = two_pairs & (first_in > morning_arrival + buffer_minutes)
+        for i in np.nonzero(late_arrival)[0]:
+            late_minutes = int(first_in[i] - morning_arrival)
+            anomalies.append({
+                'type': 'late_arrival',
+                'date': period_dates[i],
+                'severity': 'medium',
+                'time': first_in_str[i],
+                'minutes_late': late_minutes
+            })
+
+        # Check lunch departure timing
+        irregular_lunch_departure = two_pairs & (
+            np.abs(first_out - lunch_departure) > buffer_minutes
+        )
+        for i in np.nonzero(irregular_lunch_departure)[0]:
+            anomalies.append({
+                'type': 'irregular_lunch_departure',
+                'date': period_dates[i],
+                'severity': 'low',
+                'time': first_out_str[i]
+            })
+
+        # Check lunch return timing
+        late_lunch_return = two_pairs & (last_in > lunch_return + buffer_minutes)
+        for i in np.nonzero(late_lunch_return)[0]:
+            late_minutes = int(last_in[i] - lunch_return)
+            anomalies.append({
+                'type': 'late_lunch_return',
+                'date': period_dates[i],
+                'severity': 'medium',
+                'time': last_in_str[i],
+                'minutes_late': late_minutes
+            })
+
+        # Check end time
+        end_time_valid = (
+            (np.abs(last_out - end_time_1) <= buffer_minutes) |
+            (np.abs(last_out - end_time_2) <= buffer_minutes)
+        )
+        irregular_end = two_pairs & ~end_time_valid
+        for i in np.nonzero(irregular_end)[0]:
+            anomalies.append({
+                'type': 'irregular_end_time',
+                'date': period_dates[i],
+                'severity': 'low',
+                'time': last_out_str[i]
+            })
+
+        # Extra punch pairs - additional breaks
+        for i in np.nonzero(extra)[0]:
+            extra_punches = int(punches[i]) - 2
+            anomalies.append({
+                'type': 'extra_punches',
+                'date': period_dates[i],
+                'severity': 'low',
+                'extra_pairs': extra_punches
+            })
+
+
+        # Calculate anomaly score straight from the masks: integer
+        # reductions over the severity counts, no pass over the dicts
+        n_medium = int(
+            mismatches.sum() + np.count_nonzero(incomplete) +
+            np.count_nonzero(late_arrival) + np.count_nonzero(late_lunch_return)
+        )
+        n_low = int(
+            np.count_nonzero(irregular_lunch_departure) +
+            np.count_nonzero(irregular_end) + np.count_nonzero(extra)
+        )
+        score = 10 * n_missed + 5 * n_medium + 2 * n_low
+
+        result = {
             'employee': employee,
             'period': period['label'],
             'anomalies': anomalies,
             'score': score,
-            'total_days': len(expected_days),
+            'total_days': len(expected_ordinals),
             'worked_days': worked_days,
             'missed_days': missed_days
         }
+
+        with _PERIOD_CACHE_LOCK:
+            if len(_PERIOD_CACHE) >= _PERIOD_CACHE_MAX:
+                _PERIOD_CACHE.pop(next(iter(_PERIOD_CACHE)), None)  # Drop oldest entry
+            _PERIOD_CACHE[cache_key] = result
+        return result
     
     def run_analysis(self):
         """Run complete analysis for all employees across all periods."""
@@ -307,265 +606,204 @@ class TimeClockAnalyzer:
             
         self.create_two_week_periods()
         
-        # Get unique employees
-        employees = sorted(self.processed_data['employee'].unique())
-        
-        # Analyze each employee for each period
-        for employee in employees:
-            self.analysis_results[employee] = {}
-            for period in self.two_week_periods:
-                result = self.analyze_employee_period(employee, period)
-                self.analysis_results[employee][period['label']] = result
+        # Get unique employees (cached by process_data)
+        employees = self.employees
+
+        # Partition by employee once - each period analysis then works on
+        # the employee's sub-frame instead of re-filtering the full data
+        groups = dict(list(self.processed_data.groupby('employee', sort=False, observed=True)))
+
+        # Each employee's analysis is independent, so fan the employees
+        # out across a process pool - the anomaly bookkeeping is Python-
+        # level work the GIL would otherwise serialize. Each worker gets
+        # just its employee's rows, keeping pickling cost proportional
+        with ProcessPoolExecutor() as executor:
+            self.analysis_results = dict(executor.map(
+                _analyze_one_employee,
+                employees,
+                (groups.get(employee) for employee in employees),
+                repeat(self.two_week_periods)
+            ))
+        self.scores_df = None  # Rebuilt lazily from the fresh results
         
         print(f"Analysis complete for {len(employees)} employees across {len(self.two_week_periods)} periods")
         return True
     
-    def generate_detailed_punch_heatmap(self):
+    def generate_detailed_punch_heatmap(self, output_dir='.'):
         """Generate paginated heat maps with memory optimization."""
         if self.processed_data is None or len(self.processed_data) == 0:
             print("No processed data to visualize")
             return
         
-        # Get employees and create day-by-day data structure
-        employees = sorted(self.processed_data['employee'].unique())
-        
-        # CHANGE REQUEST #4: Create master list of ALL dates worked by ANY employee
-        all_dates = sorted(self.processed_data['date'].unique())
-        
-        # Create data structure for punch details
-        punch_data = {}
-        color_data = {}
-        total_hours_data = {}
+        # Employee and date axes were cached by process_data
+        employees = self.employees
         
-        # Process all data first (this is relatively memory efficient)
-        for employee in employees:
-            punch_data[employee] = {}
-            color_data[employee] = {}
-            total_hours_data[employee] = {}
-            
-            # Get employee's data
-            emp_data = self.processed_data[self.processed_data['employee'] == employee]
-            employee_dates = set(emp_data['date'].unique())
-            
+        # CHANGE REQUEST #4: Master list of ALL dates worked by ANY employee
+        all_dates = self.all_dates
+
+        # Rank punch pairs within each (employee, date) once and pivot the
+        # first/second pairs into per-slot lookup maps, instead of
+        # re-filtering the full DataFrame for every employee-day cell
+        df = self.processed_data.sort_values(['employee', 'date', 'in_time_minutes'])
+        grouped = df.groupby(['employee', 'date'], observed=True)
+        df = df.assign(
+            pair_idx=grouped.cumcount(),
+            first_in=grouped['in_time_minutes'].transform('first')
+        )
+        first_is_morning = df['first_in'] < 660  # First punch before 11:00 AM
+        # First pair goes to the morning columns only if it starts before
+        # 11:00 AM; a second pair is shown (in the afternoon columns) only
+        # when the first pair was a morning one - same rules as before
+        df = df.assign(slot=np.where(
+            df['pair_idx'] == 0,
+            np.where(first_is_morning, 'morn', 'aft'),
+            np.where((df['pair_idx'] == 1) & first_is_morning, 'aft', '')
+        ))
+
+        slot_cols = ['in_time_str', 'out_time_str', 'in_time_minutes',
+                     'out_time_minutes', 'in_date', 'out_date']
+        morn = df.loc[df['slot'] == 'morn'].set_index(['employee', 'date'])[slot_cols]
+        aft = df.loc[df['slot'] == 'aft'].set_index(['employee', 'date'])[slot_cols]
+
+        # Bucket every deviation into the severity palette in one
+        # searchsorted pass per column instead of an if/elif ladder per cell
+        morn_in = morn['in_time_minutes'].to_numpy(dtype=np.int32)
+        morn_out = morn['out_time_minutes'].to_numpy(dtype=np.int32)
+        morn = morn.assign(
+            in_color=_severity_indices(np.abs(morn_in - self.EXPECTED_MORNING_ARRIVAL)),
+            out_color=_severity_indices(np.abs(morn_out - self.EXPECTED_LUNCH_DEPARTURE))
+        )
+        # Missed out punch (InDate != OutDate) overrides with purple
+        morn.loc[morn['in_date'] != morn['out_date'], 'out_color'] = PURPLE_IDX
+
+        aft_in = aft['in_time_minutes'].to_numpy(dtype=np.int32)
+        aft_out = aft['out_time_minutes'].to_numpy(dtype=np.int32)
+        aft = aft.assign(
+            in_color=_severity_indices(np.abs(aft_in - self.EXPECTED_LUNCH_RETURN)),
+            out_color=_severity_indices(np.minimum(
+                np.abs(aft_out - self.EXPECTED_END_TIME_1),
+                np.abs(aft_out - self.EXPECTED_END_TIME_2)
+            ))
+        )
+        aft.loc[aft['in_date'] != aft['out_date'], 'out_color'] = PURPLE_IDX
+
+        morn_map = morn.to_dict('index')
+        aft_map = aft.to_dict('index')
+        counts_map = grouped.size().to_dict()
+
+        # Minutes worked per punch pair in one vectorized pass; the
+        # modulo wraps out punches past midnight to +1440, same as the
+        # old per-record negative check. One groupby-sum then yields
+        # every (employee, date) daily total
+        minutes_worked = (
+            df['out_time_minutes'].to_numpy(np.int32) -
+            df['in_time_minutes'].to_numpy(np.int32)
+        ) % 1440
+        totals_map = df.assign(minutes_worked=minutes_worked).groupby(
+            ['employee', 'date'], observed=True
+        )['minutes_worked'].sum().to_dict()
+
+        # Row labels were formatted once in process_data
+        day_keys = self.day_keys
+
+        # Assemble the page data as flat (employee x day x field) arrays
+        # - fields are morn_in, morn_out, aft_in, aft_out - instead of
+        # two-level dicts: the renderer indexes by integer position with
+        # no per-cell hashing, and a page's share is a plain array slice
+        n_days = len(all_dates)
+        punch_data = np.full((len(employees), n_days, 4), '', dtype=object)
+        color_data = np.full((len(employees), n_days, 4), DEFAULT_IDX, dtype=np.int8)
+        total_hours_data = np.full((len(employees), n_days), '0:00', dtype=object)
+
+        for emp_idx, employee in enumerate(employees):
             # Process ALL dates for this employee
-            for date in all_dates:
-                day_name = date.strftime('%a')  # Mon, Tue, Wed, Thu, Fri
-                day_key = f"{date.strftime('%m/%d')} ({day_name})"
+            for day_idx, date in enumerate(all_dates):
+                daily_punch_count = counts_map.get((employee, date), 0)
                 
                 # Check if employee worked on this date
-                if date in employee_dates:
-                    # Employee worked on this date - process normally
-                    day_data = emp_data[emp_data['date'] == date].sort_values('in_time_minutes')
-                    
-                    # Check for multiple punch detection (>2 punch pairs per day)
-                    daily_punch_count = len(day_data)
+                if daily_punch_count:
+                    # Multiple punch detection (>2 punch pairs per day)
                     flagged_for_multiple_punches = daily_punch_count > 2
-                    
-                    punch_data[employee][day_key] = {
-                        'morn_in': '',
-                        'morn_out': '',
-                        'aft_in': '',
-                        'aft_out': ''
-                    }
-                    # Initialize with default colors (may be overridden for flagged days)
-                    default_color = '#FFB6C1' if flagged_for_multiple_punches else '#F8F8F8'
-                    color_data[employee][day_key] = {
-                        'morn_in': default_color,
-                        'morn_out': default_color,
-                        'aft_in': default_color,
-                        'aft_out': default_color
-                    }
-                    
-                    # Process punch pairs for this day
-                    records = day_data.to_dict('records')
+                    if flagged_for_multiple_punches:
+                        color_data[emp_idx, day_idx] = FLAGGED_IDX
                 else:
                     # Employee was absent - show N/A with gray background
                     flagged_for_multiple_punches = False  # No flagging for absent days
-                    
-                    punch_data[employee][day_key] = {
-                        'morn_in': 'N/A',
-                        'morn_out': 'N/A',
-                        'aft_in': 'N/A',
-                        'aft_out': 'N/A'
-                    }
-                    color_data[employee][day_key] = {
-                        'morn_in': '#D3D3D3',  # Gray background for absent days
-                        'morn_out': '#D3D3D3',
-                        'aft_in': '#D3D3D3',
-                        'aft_out': '#D3D3D3'
-                    }
-                    records = []  # No records to process for absent days
+                    punch_data[emp_idx, day_idx] = 'N/A'
+                    color_data[emp_idx, day_idx] = ABSENT_IDX
                 
-                # Process records (same logic as before)
-                if len(records) >= 1:
-                    # First punch pair - determine if morning or afternoon based on start time
-                    first_rec = records[0]
-                    first_punch_time = first_rec['in_time_minutes']
-                    
-                    # Check if first punch is before 11:00 AM (660 minutes from midnight)
-                    if first_punch_time < 660:  # Before 11:00 AM
-                        # Place in morning columns
-                        punch_data[employee][day_key]['morn_in'] = first_rec['in_time_str']
-                        punch_data[employee][day_key]['morn_out'] = first_rec['out_time_str']
-                        morning_rec = first_rec
-                    else:  # 11:00 AM or later
-                        # Place in afternoon columns
-                        punch_data[employee][day_key]['aft_in'] = first_rec['in_time_str']
-                        punch_data[employee][day_key]['aft_out'] = first_rec['out_time_str']
-                        afternoon_rec = first_rec
-                    
-                    # Skip color analysis for flagged multiple punch days - keep pink background
-                    if not flagged_for_multiple_punches:
-                        # Apply color analysis based on where the first punch was placed
-                        if first_punch_time < 660:  # First punch was placed in morning columns
-                            # Enhanced severity color classification for morning in
-                            morn_in_diff = abs(morning_rec['in_time_minutes'] - self.EXPECTED_MORNING_ARRIVAL)
-                            if morn_in_diff <= 5:
-                                color_data[employee][day_key]['morn_in'] = '#228B22'  # Green: Acceptable
-                            elif morn_in_diff <= 7:
-                                color_data[employee][day_key]['morn_in'] = '#DAA520'  # Yellow: Minor Delay
-                            elif morn_in_diff <= 11:
-                                color_data[employee][day_key]['morn_in'] = '#FF6600'  # Orange: Major Delay
-                            else:
-                                color_data[employee][day_key]['morn_in'] = '#DC143C'  # Red: Significant Delay
-                            
-                            # Enhanced severity color classification for lunch departure
-                            morn_out_diff = abs(morning_rec['out_time_minutes'] - self.EXPECTED_LUNCH_DEPARTURE)
-                            if morn_out_diff <= 5:
-                                color_data[employee][day_key]['morn_out'] = '#228B22'  # Green: Acceptable
-                            elif morn_out_diff <= 7:
-                                color_data[employee][day_key]['morn_out'] = '#DAA520'  # Yellow: Minor Delay
-                            elif morn_out_diff <= 11:
-                                color_data[employee][day_key]['morn_out'] = '#FF6600'  # Orange: Major Delay
-                            else:
-                                color_data[employee][day_key]['morn_out'] = '#DC143C'  # Red: Significant Delay
-                            
-                            # Check for missed out punch (InDate != OutDate)
-                            if morning_rec['in_date'] != morning_rec['out_date']:
-                                color_data[employee][day_key]['morn_out'] = '#9932CC'  # Purple: Missed Out Punch
-                        else:  # First punch was placed in afternoon columns
-                            # For afternoon starters, compare against lunch return like normal
-                            aft_in_diff = abs(afternoon_rec['in_time_minutes'] - self.EXPECTED_LUNCH_RETURN)
-                            if aft_in_diff <= 5:
-                                color_data[employee][day_key]['aft_in'] = '#228B22'  # Green: Acceptable
-                            elif aft_in_diff <= 7:
-                                color_data[employee][day_key]['aft_in'] = '#DAA520'  # Yellow: Minor Delay
-                            elif aft_in_diff <= 11:
-                                color_data[employee][day_key]['aft_in'] = '#FF6600'  # Orange: Major Delay
-                            else:
-                                color_data[employee][day_key]['aft_in'] = '#DC143C'  # Red: Significant Delay
-                            
-                            # Color end time
-                            aft_out_time = afternoon_rec['out_time_minutes']
-                            end_time_diff_1 = abs(aft_out_time - self.EXPECTED_END_TIME_1)
-                            end_time_diff_2 = abs(aft_out_time - self.EXPECTED_END_TIME_2)
-                            min_end_diff = min(end_time_diff_1, end_time_diff_2)
-                            
-                            if min_end_diff <= 5:
-                                color_data[employee][day_key]['aft_out'] = '#228B22'  # Green: Acceptable
-                            elif min_end_diff <= 7:
-                                color_data[employee][day_key]['aft_out'] = '#DAA520'  # Yellow: Minor Delay
-                            elif min_end_diff <= 11:
-                                color_data[employee][day_key]['aft_out'] = '#FF6600'  # Orange: Major Delay
-                            else:
-                                color_data[employee][day_key]['aft_out'] = '#DC143C'  # Red: Significant Delay
-                            
-                            # Check for missed out punch (InDate != OutDate)
-                            if afternoon_rec['in_date'] != afternoon_rec['out_date']:
-                                color_data[employee][day_key]['aft_out'] = '#9932CC'  # Purple: Missed Out Punch
+                morning_rec = morn_map.get((employee, date))
+                afternoon_rec = aft_map.get((employee, date))
                 
-                if len(records) >= 2:
-                    # Handle second punch pair - only if first punch was in morning
-                    if first_punch_time < 660:  # First punch was in morning, so this is afternoon
-                        afternoon_rec = records[1]
-                        punch_data[employee][day_key]['aft_in'] = afternoon_rec['in_time_str']
-                        punch_data[employee][day_key]['aft_out'] = afternoon_rec['out_time_str']
-                        
-                        # Skip color analysis for flagged multiple punch days - keep pink background
-                        if not flagged_for_multiple_punches:
-                            # Enhanced severity color classification for lunch return
-                            aft_in_diff = abs(afternoon_rec['in_time_minutes'] - self.EXPECTED_LUNCH_RETURN)
-                            if aft_in_diff <= 5:
-                                color_data[employee][day_key]['aft_in'] = '#228B22'  # Green: Acceptable
-                            elif aft_in_diff <= 7:
-                                color_data[employee][day_key]['aft_in'] = '#DAA520'  # Yellow: Minor Delay
-                            elif aft_in_diff <= 11:
-                                color_data[employee][day_key]['aft_in'] = '#FF6600'  # Orange: Major Delay
-                            else:
-                                color_data[employee][day_key]['aft_in'] = '#DC143C'  # Red: Significant Delay
-                            
-                            # Enhanced severity color classification for end of day
-                            aft_out_time = afternoon_rec['out_time_minutes']
-                            end_time_diff_1 = abs(aft_out_time - self.EXPECTED_END_TIME_1)
-                            end_time_diff_2 = abs(aft_out_time - self.EXPECTED_END_TIME_2)
-                            min_end_diff = min(end_time_diff_1, end_time_diff_2)
-                            
-                            if min_end_diff <= 5:
-                                color_data[employee][day_key]['aft_out'] = '#228B22'  # Green: Acceptable
-                            elif min_end_diff <= 7:
-                                color_data[employee][day_key]['aft_out'] = '#DAA520'  # Yellow: Minor Delay
-                            elif min_end_diff <= 11:
-                                color_data[employee][day_key]['aft_out'] = '#FF6600'  # Orange: Major Delay
-                            else:
-                                color_data[employee][day_key]['aft_out'] = '#DC143C'  # Red: Significant Delay
-                            
-                            # Check for missed out punch (InDate != OutDate)
-                            if afternoon_rec['in_date'] != afternoon_rec['out_date']:
-                                color_data[employee][day_key]['aft_out'] = '#9932CC'  # Purple: Missed Out Punch
+                if morning_rec is not None:
+                    punch_data[emp_idx, day_idx, 0] = morning_rec['in_time_str']
+                    punch_data[emp_idx, day_idx, 1] = morning_rec['out_time_str']
+                if afternoon_rec is not None:
+                    punch_data[emp_idx, day_idx, 2] = afternoon_rec['in_time_str']
+                    punch_data[emp_idx, day_idx, 3] = afternoon_rec['out_time_str']
                 
-                # Calculate total hours for this day
-                # Get ALL records for this employee on this date to handle irregular days
-                date_str = date.strftime('%m/%d/%y') if date in employee_dates else None
-                if date_str:
-                    # Get all punch pairs for this specific date
-                    all_day_records = day_data if date in employee_dates else []
-                    total_minutes = 0
-                    
-                    # Sum up all punch pairs
-                    for record in records:
-                        if record['in_time_minutes'] is not None and record['out_time_minutes'] is not None:
-                            # Calculate time worked for this punch pair
-                            minutes_worked = record['out_time_minutes'] - record['in_time_minutes']
-                            # Handle case where out punch is past midnight
-                            if minutes_worked < 0:
-                                minutes_worked += 1440  # Add 24 hours
-                            total_minutes += minutes_worked
-                    
-                    # Convert to hours:minutes format
+                # Skip color analysis for flagged multiple punch days - keep pink background
+                if not flagged_for_multiple_punches:
+                    if morning_rec is not None:
+                        color_data[emp_idx, day_idx, 0] = morning_rec['in_color']
+                        color_data[emp_idx, day_idx, 1] = morning_rec['out_color']
+                    if afternoon_rec is not None:
+                        color_data[emp_idx, day_idx, 2] = afternoon_rec['in_color']
+                        color_data[emp_idx, day_idx, 3] = afternoon_rec['out_color']
+                
+                # Total hours for this day across all punch pairs
+                # (irregular days can have more pairs than the two displayed)
+                if daily_punch_count:
+                    total_minutes = int(totals_map[(employee, date)])
                     hours = total_minutes // 60
                     minutes = total_minutes % 60
-                    total_hours_data[employee][day_key] = f"{hours}:{minutes:02d}"
-                else:
-                    # Absent day
-                    total_hours_data[employee][day_key] = "0:00"
-        
+                    total_hours_data[emp_idx, day_idx] = f"{hours}:{minutes:02d}"
+
         # Now generate pages
         employees_per_page = 2
         total_pages = (len(employees) + employees_per_page - 1) // employees_per_page
-        
+        final_pdf = os.path.join(output_dir, 'timeclock_detailed_heatmap.pdf')
+
         # List to store PDF files
         temp_pdf_files = []
-        
+
         print(f"Generating {total_pages} pages for {len(employees)} employees...")
-        
-        for page_num in range(total_pages):
-            start_idx = page_num * employees_per_page
-            end_idx = min(start_idx + employees_per_page, len(employees))
-            employees_subset = employees[start_idx:end_idx]
-            
-            print(f"  Processing page {page_num + 1}/{total_pages}: {', '.join(employees_subset)}")
-            
-            # Generate page and save as temporary PDF
-            temp_filename = f'temp_page_{page_num + 1}.pdf'
+
+        # Single-page runs need no temp file or merge pass - render
+        # straight into the final PDF
+        if total_pages == 1:
             self.generate_detailed_punch_heatmap_page(
-                employees_subset, page_num + 1, total_pages,
-                punch_data, color_data, total_hours_data, temp_filename
+                employees, 1, 1, punch_data, color_data, total_hours_data,
+                day_keys, final_pdf
             )
-            temp_pdf_files.append(temp_filename)
-            
-            # Clear memory
-            plt.close('all')
-            gc.collect()
+            print("Enhanced heat map saved:")
+            print("  - timeclock_detailed_heatmap.pdf (Multi-page PDF)")
+            return
+        
+        # Pages are independent figures, and matplotlib rendering + PDF
+        # writing dominates the cost, so render them concurrently in a
+        # process pool. Each worker receives only the dict slices for its
+        # own employees to keep pickling traffic small
+        with ProcessPoolExecutor() as executor:
+            futures = []
+            for page_num in range(total_pages):
+                start_idx = page_num * employees_per_page
+                end_idx = min(start_idx + employees_per_page, len(employees))
+                employees_subset = employees[start_idx:end_idx]
+
+                temp_filename = os.path.join(output_dir, f'temp_page_{page_num + 1}.pdf')
+                futures.append(executor.submit(
+                    self.generate_detailed_punch_heatmap_page,
+                    employees_subset, page_num + 1, total_pages,
+                    punch_data[start_idx:end_idx],
+                    color_data[start_idx:end_idx],
+                    total_hours_data[start_idx:end_idx],
+                    day_keys, temp_filename
+                ))
+                temp_pdf_files.append(temp_filename)
+
+            for future in futures:
+                future.result()  # Propagate any rendering error
         
         # Combine all PDFs into one
         print("Combining pages into single PDF...")
@@ -576,7 +814,7 @@ class TimeClockAnalyzer:
                 merger.append(pdf_file)
         
         # Save final combined PDF
-        merger.write('timeclock_detailed_heatmap.pdf')
+        merger.write(final_pdf)
         merger.close()
         
         # Clean up temporary files
@@ -587,8 +825,16 @@ class TimeClockAnalyzer:
         print("Enhanced heat map saved:")
         print("  - timeclock_detailed_heatmap.pdf (Multi-page PDF)")
     
-    def generate_detailed_punch_heatmap_page(self, employees_subset, page_num, total_pages, punch_data, color_data, total_hours_data, output_filename):
-        """Generate a single page of the heat map for a subset of employees."""
+    @staticmethod
+    def generate_detailed_punch_heatmap_page(employees_subset, page_num, total_pages, punch_data, color_data, total_hours_data, day_keys, output_filename):
+        """Generate a single page of the heat map for a subset of employees.
+
+        Static (and therefore picklable by name) so pages can be rendered
+        in worker processes; everything it needs arrives as arguments.
+        punch_data / color_data / total_hours_data are the (employee,
+        day[, field]) array slices for just this page's employees, with
+        day_keys labelling the day axis.
+        """
         # Enhanced column headers
         columns = ['Morning\nArrival', 'Lunch\nDeparture', 'Lunch\nReturn', 'End of\nDay', 'Total\nHours']
         column_positions = [0.5, 1.5, 2.5, 3.5, 4.25]  # Total hours column is narrower
@@ -600,7 +846,7 @@ class TimeClockAnalyzer:
         employee_separators = []
         
         # Calculate figure size for just these employees
-        total_rows = sum(len(punch_data[emp]) for emp in employees_subset if emp in punch_data)
+        total_rows = len(employees_subset) * len(day_keys)
         # Add spacing rows
         if len(employees_subset) > 1:
             total_rows += len(employees_subset) - 1
@@ -612,8 +858,14 @@ class TimeClockAnalyzer:
         fig_width = 8.5
         fig_height = 11  # Keep consistent height regardless of employee count
         
-        # Create figure with only one subplot (no secondary heat map for memory efficiency)
-        fig, ax1 = plt.subplots(1, 1, figsize=(fig_width, fig_height))
+        # Create (or reuse) the figure with only one subplot (no
+        # secondary heat map for memory efficiency)
+        global _PAGE_FIG
+        if _PAGE_FIG is None:
+            _PAGE_FIG = plt.figure(figsize=(fig_width, fig_height))
+        fig = _PAGE_FIG
+        fig.clear()
+        ax1 = fig.add_subplot(1, 1, 1)
         
         # Set professional styling
         plt.style.use('default')
@@ -621,50 +873,33 @@ class TimeClockAnalyzer:
         
         # Title removed per request
         
-        # Build grid data for subset of employees
+        # Resolve the hours-column color for every (employee, day) up
+        # front in one vectorized pass - "H:MM" strings are split and
+        # compared as arrays instead of re-parsed per cell in the loop
+        H = total_hours_data.astype('<U8')
+        parts = np.char.partition(H, ':')
+        hours_float = parts[..., 0].astype(np.int16) + parts[..., 2].astype(np.int16) / 60.0
+        hours_colors = np.select(
+            [H == '0:00', hours_float < 7.5, hours_float > 8.5],
+            ['#D3D3D3', '#9247d5', '#2c67dc'],  # Absent / under-hours / overtime
+            default='#FFFFFF'
+        )
+
+        # Build grid data for subset of employees - pure positional
+        # indexing into the page's arrays, no per-cell dict lookups
         row_index = 0
         for emp_idx, employee in enumerate(employees_subset):
-            if employee not in punch_data:
-                continue
-                
-            employee_days = sorted([day for day in punch_data[employee].keys()])
             employee_start_row = row_index
             
-            for day in employee_days:
+            for day_idx, day in enumerate(day_keys):
                 all_employees_expanded.append(f"{employee}\n{day}")
                 
-                # Get punch times and colors for this employee-day
-                day_punches = [
-                    punch_data[employee][day]['morn_in'],
-                    punch_data[employee][day]['morn_out'],
-                    punch_data[employee][day]['aft_in'],
-                    punch_data[employee][day]['aft_out'],
-                    total_hours_data[employee][day]  # Add total hours
-                ]
-                
-                # Determine color for total hours based on value
-                total_hours_str = total_hours_data[employee][day]
-                if total_hours_str == "0:00":
-                    # Absent day
-                    hours_color = '#D3D3D3'  # Gray for absent
-                else:
-                    # Parse hours and minutes
-                    hours_parts = total_hours_str.split(':')
-                    total_hours_float = float(hours_parts[0]) + float(hours_parts[1])/60
-                    
-                    if total_hours_float < 7.5:
-                        hours_color = '#9247d5'  # Purple for under-hours
-                    elif total_hours_float > 8.5:
-                        hours_color = '#2c67dc'  # Blue background for overtime
-                    else:
-                        hours_color = '#FFFFFF'  # White background for normal hours
-                
+                # Punch times and colors for this employee-day; palette
+                # indices resolve to hex only here, at draw time
+                day_punches = [*punch_data[emp_idx, day_idx], total_hours_data[emp_idx, day_idx]]
                 day_colors = [
-                    color_data[employee][day]['morn_in'],
-                    color_data[employee][day]['morn_out'],
-                    color_data[employee][day]['aft_in'],
-                    color_data[employee][day]['aft_out'],
-                    hours_color  # Add color for total hours
+                    *(PALETTE[idx] for idx in color_data[emp_idx, day_idx]),
+                    hours_colors[emp_idx, day_idx]  # Color for total hours
                 ]
                 
                 punch_times_grid.append(day_punches)
@@ -680,111 +915,109 @@ class TimeClockAnalyzer:
                 row_index += 1
             
             # Mark employee separator
-            employee_separators.append(employee_start_row + len(employee_days))
-        
-        # Create the enhanced heatmap with larger cells and better spacing
+            employee_separators.append(employee_start_row + len(day_keys))
+        
+        # Draw every cell in one batched PolyCollection instead of one
+        # plt.Rectangle + add_patch per cell: vertices, face colors, edge
+        # colors and line widths are all built as flat arrays. Styling is
+        # unchanged - the hours column (j == 4) is half width with a bold
+        # border, spacing rows are borderless white, data cells keep the
+        # slight padding and 0.9 alpha
+        n_rows = len(punch_times_grid)
+        ii, jj = np.divmod(np.arange(n_rows * 5), 5)
+        colors_flat = np.array(colors_grid, dtype=object).ravel()
+        spacing = colors_flat == 'white'
+        hours_col = jj == 4
+
+        x = jj + 0.02
+        y = ii + 0.02  # Natural row order; the y-axis is inverted below
+        w = np.where(hours_col, 0.48, 0.96)
+        verts = np.empty((n_rows * 5, 4, 2))
+        verts[:, 0, 0] = x
+        verts[:, 1, 0] = x + w
+        verts[:, 2, 0] = x + w
+        verts[:, 3, 0] = x
+        verts[:, 0, 1] = y
+        verts[:, 1, 1] = y
+        verts[:, 2, 1] = y + 0.96
+        verts[:, 3, 1] = y + 0.96
+
+        facecolors = mcolors.to_rgba_array(list(colors_flat))
+        facecolors[:, 3] = np.where(spacing | hours_col, 1.0, 0.9)
+        # Rasterize the cell-fill layer: the PDF then embeds one image
+        # (resampled at the savefig dpi) instead of thousands of filled
+        # paths, while the text, ticks and legend stay vector
+        ax1.add_collection(PolyCollection(
+            verts,
+            facecolors=facecolors,
+            edgecolors=np.where(spacing, 'white', '#34495E'),
+            linewidths=np.where(spacing, 0.0, np.where(hours_col, 2.0, 1.5)),
+            rasterized=True
+        ))
+
+        # Classify cells first, then draw grouped by style. One Text
+        # artist per cell is unavoidable in matplotlib, but grouping lets
+        # every cell in a group share a single pre-built kwargs dict and
+        # keeps the drawing loop branch-free
+        text_groups = defaultdict(list)
+        FLAGGED_STYLE = dict(ha='center', va='center', fontsize=8,
+                             style='italic', color='#495057', fontweight='normal')
+        NA_STYLE = dict(ha='center', va='center', fontsize=9, fontweight='normal',
+                        color='#6C757D', style='italic')
+
+        # Bind the lookups used per cell to locals once, outside the loop
+        text_color_get = TEXT_COLOR_FOR_BG.get
+        hours_color_get = HOURS_TEXT_COLOR.get
+        flagged_cells = text_groups[('flagged',)]
+        na_cells = text_groups[('na',)]
+
         for i, (row_punches, row_colors) in enumerate(zip(punch_times_grid, colors_grid)):
+            y_center = i + 0.5
             for j, (punch_time, color) in enumerate(zip(row_punches, row_colors)):
-                # Handle spacing rows without borders for clean separation
+                # Skip text rendering for spacing rows (white background)
                 if color == 'white':
-                    # Spacing row - no border, clean white space
-                    if j == 4:  # Narrower column for total hours
-                        rect = plt.Rectangle((j + 0.02, len(punch_times_grid) - 1 - i + 0.02), 
-                                           0.48, 0.96,  # Half width for spacing in total hours column
-                                           facecolor=color,
-                                           edgecolor='white', linewidth=0,
-                                           alpha=1.0)
-                    else:
-                        rect = plt.Rectangle((j + 0.02, len(punch_times_grid) - 1 - i + 0.02), 
-                                           0.96, 0.96,
-                                           facecolor=color,
-                                           edgecolor='white', linewidth=0,
-                                           alpha=1.0)
-                else:
-                    # Check if this is the total hours column
-                    if j == 4:  # Total hours column
-                        # Special formatting for total hours with reduced width
-                        rect = plt.Rectangle((j + 0.02, len(punch_times_grid) - 1 - i + 0.02), 
-                                           0.48, 0.96,  # Half width (0.48 instead of 0.96)
-                                           facecolor=color,
-                                           edgecolor='#34495E', linewidth=2.0,  # Bold dark gray border
-                                           alpha=1.0)
-                    else:
-                        # Regular data cell
-                        rect = plt.Rectangle((j + 0.02, len(punch_times_grid) - 1 - i + 0.02), 
-                                           0.96, 0.96,  # Slightly smaller than 1 to create padding
-                                           facecolor=color,
-                                           edgecolor='#34495E', linewidth=1.5,
-                                           alpha=0.9)
-                ax1.add_patch(rect)
-                
-                # Add punch time text with enhanced readability
+                    continue
+
                 if punch_time:
-                    # Skip text rendering for spacing rows (white background)
-                    if color == 'white':
-                        continue  # Don't render any text for spacing rows
-                    
                     # Handle flagged multiple punch notation
-                    if color == '#FFB6C1' and j == 3:  # Pink background on last column (End of Day)
-                        # Add flagged notation in italic dark gray
-                        ax1.text(j + 0.5, len(punch_times_grid) - 1 - i + 0.5, 
-                               'Flagged: Additional\nPunches Detected',
-                               ha='center', va='center', fontsize=8, 
-                               style='italic', color='#495057', fontweight='normal')
-                        continue  # Skip normal punch time rendering for this cell
-                    
-                    # Check if this is the total hours column
-                    if j == 4:  # Total hours column
-                        # Special handling for hours column
-                        if color == '#2c67dc':  # Blue background (overtime)
-                            text_color = 'white'
-                        elif color == '#9247d5':  # Purple background (under-hours)
-                            text_color = 'white'
-                        elif color == '#D3D3D3':  # Gray background (absent)
-                            text_color = '#6C757D'
-                        else:  # White background (normal hours)
-                            text_color = '#2C3E50'  # Dark text
-                        
-                        # Render with bold monospace font, adjusted for narrower column
-                        ax1.text(j + 0.25, len(punch_times_grid) - 1 - i + 0.5, punch_time,
-                               ha='center', va='center', fontsize=11, fontweight='bold',
-                               color=text_color, family='monospace')
-                    else:
-                        # Determine text color based on new color scheme
-                        if color == '#228B22':  # Green: Acceptable
-                            text_color = '#2C3E50'  # Dark text for readability
-                        elif color == '#DAA520':  # Yellow: Minor Delay
-                            text_color = '#2C3E50'  # Dark text for readability
-                        elif color == '#FF6600':  # Orange: Major Delay
-                            text_color = 'white'  # White text for contrast
-                        elif color == '#DC143C':  # Red: Significant Delay
-                            text_color = 'white'  # White text for contrast
-                        elif color == '#9932CC':  # Purple: Missed Out Punch
-                            text_color = 'white'  # White text for contrast
-                        elif color == '#FFB6C1':  # Pink: Multiple punches flagged
-                            text_color = '#495057'  # Dark gray for readability
-                        elif color == '#D3D3D3':  # Gray: Absent days
-                            text_color = '#6C757D'  # Medium gray for N/A text
-                        else:  # Light gray (missing data)
-                            text_color = '#6C757D'  # Medium gray
-                        
-                        ax1.text(j + 0.5, len(punch_times_grid) - 1 - i + 0.5, punch_time,
-                               ha='center', va='center', fontsize=10, fontweight='bold',
-                               color=text_color, family='monospace')
-                elif color != 'white':  # Don't show N/A for spacing rows
-                    # Show "N/A" for missing punches (but not for spacing rows)
-                    if color == '#D3D3D3':  # Absent day styling
-                        text_color = '#6C757D'  # Medium gray for absent days
+                    if color == '#FFB6C1' and j == 3:  # Pink background on End of Day
+                        flagged_cells.append(
+                            (j + 0.5, y_center, 'Flagged: Additional\nPunches Detected'))
+                    elif j == 4:  # Total hours column: bold, narrower
+                        text_groups[('hours', hours_color_get(color, '#2C3E50'))].append(
+                            (j + 0.25, y_center, punch_time))
                     else:
-                        text_color = '#6C757D'  # Medium gray for missing punches
-                    
-                    ax1.text(j + 0.5, len(punch_times_grid) - 1 - i + 0.5, 'N/A',
-                           ha='center', va='center', fontsize=9, fontweight='normal',
-                           color=text_color, style='italic')
-        
-        # Enhanced axes setup
+                        # Text color keyed on the cell background
+                        text_groups[('punch', text_color_get(color, '#6C757D'))].append(
+                            (j + 0.5, y_center, punch_time))
+                else:
+                    # "N/A" for missing punches; absent and missing cells
+                    # share the same gray
+                    na_cells.append((j + 0.5, y_center, 'N/A'))
+
+        draw_text = ax1.text
+        for key, cells in text_groups.items():
+            if not cells:
+                continue
+            if key[0] == 'flagged':
+                kwargs = FLAGGED_STYLE
+            elif key[0] == 'na':
+                kwargs = NA_STYLE
+            elif key[0] == 'hours':
+                kwargs = dict(ha='center', va='center', fontsize=11, fontweight='bold',
+                              color=key[1], family='monospace')
+            else:
+                kwargs = dict(ha='center', va='center', fontsize=10, fontweight='bold',
+                              color=key[1], family='monospace')
+            for tx, ty, s in cells:
+                draw_text(tx, ty, s, **kwargs)
+        
+        # Enhanced axes setup. Rows are drawn in natural order and the
+        # y-axis is inverted once, instead of computing n - 1 - i flipped
+        # coordinates for every cell and reversing the label list
         ax1.set_xlim(-0.1, 4.7)  # Adjusted for narrower total hours column
-        ax1.set_ylim(-0.1, len(punch_times_grid) + 1.5)  # Extra space for column headers at top
+        ax1.set_ylim(-1.5, len(punch_times_grid) + 0.1)  # Extra space for column headers at top
+        ax1.invert_yaxis()
         
         # Move column headers to top
         ax1.set_xticks(column_positions)
@@ -792,21 +1025,26 @@ class TimeClockAnalyzer:
         
         # Add column headers at the top
         for i, (pos, col) in enumerate(zip(column_positions, columns)):
-            ax1.text(pos, len(punch_times_grid) + 0.5, col, 
+            ax1.text(pos, -0.5, col, 
                     ha='center', va='bottom', fontsize=11, fontweight='bold', 
                     color='#2C3E50')
         
         # Enhanced row labels (employee names and days)
         ax1.set_yticks([i + 0.5 for i in range(len(all_employees_expanded))])
-        ax1.set_yticklabels(reversed(all_employees_expanded), fontsize=8, color='#2C3E50')
+        ax1.set_yticklabels(all_employees_expanded, fontsize=8, color='#2C3E50')
         
         # Enhanced axis labels
         ax1.set_ylabel('EMPLOYEES & WORK DAYS', fontsize=11, fontweight='bold', color='#2C3E50', labelpad=10)
         
-        # Add professional employee separator lines
-        for sep_row in employee_separators:
-            if sep_row < len(punch_times_grid) - 1:  # Don't draw after last employee
-                ax1.axhline(y=len(punch_times_grid) - sep_row - 0.5, color='#34495E', linewidth=1.5, alpha=0.3)
+        # Add professional employee separator lines - one LineCollection
+        # for all separators instead of a Line2D artist per axhline
+        sep_ys = [sep_row + 0.5 for sep_row in employee_separators
+                  if sep_row < len(punch_times_grid) - 1]  # Don't draw after last employee
+        if sep_ys:
+            ax1.add_collection(LineCollection(
+                [[(-0.1, y), (4.7, y)] for y in sep_ys],
+                colors='#34495E', linewidths=1.5, alpha=0.3
+            ))
         
         # Grid styling
         ax1.set_axisbelow(True)
@@ -821,20 +1059,22 @@ class TimeClockAnalyzer:
         
         # Only add legend on page 1
         if page_num == 1:
-            # Create horizontal color legend at the top
-            legend_elements = [
-                plt.Rectangle((0, 0), 1, 1, facecolor='#228B22', label='Acceptable (±5 min)'),
-                plt.Rectangle((0, 0), 1, 1, facecolor='#DAA520', label='Minor (5-7 min)'),
-                plt.Rectangle((0, 0), 1, 1, facecolor='#FF6600', label='Major (7-11 min)'),
-                plt.Rectangle((0, 0), 1, 1, facecolor='#DC143C', label='Significant (>11 min)'),
-                plt.Rectangle((0, 0), 1, 1, facecolor='#9932CC', label='Missed Out Punch'),
-                plt.Rectangle((0, 0), 1, 1, facecolor='#FFB6C1', edgecolor='#34495E', label='Multiple Punches'),
-                plt.Rectangle((0, 0), 1, 1, facecolor='#F8F8F8', edgecolor='#34495E', label='Missing Data'),
-                plt.Rectangle((0, 0), 1, 1, facecolor='#D3D3D3', edgecolor='#34495E', label='Absent Day')
-            ]
+            if TimeClockAnalyzer._LEGEND_HANDLES is None:
+                # Horizontal color legend handles, created once and cached
+                TimeClockAnalyzer._LEGEND_HANDLES = [
+                    plt.Rectangle((0, 0), 1, 1, facecolor='#228B22', label='Acceptable (±5 min)'),
+                    plt.Rectangle((0, 0), 1, 1, facecolor='#DAA520', label='Minor (5-7 min)'),
+                    plt.Rectangle((0, 0), 1, 1, facecolor='#FF6600', label='Major (7-11 min)'),
+                    plt.Rectangle((0, 0), 1, 1, facecolor='#DC143C', label='Significant (>11 min)'),
+                    plt.Rectangle((0, 0), 1, 1, facecolor='#9932CC', label='Missed Out Punch'),
+                    plt.Rectangle((0, 0), 1, 1, facecolor='#FFB6C1', edgecolor='#34495E', label='Multiple Punches'),
+                    plt.Rectangle((0, 0), 1, 1, facecolor='#F8F8F8', edgecolor='#34495E', label='Missing Data'),
+                    plt.Rectangle((0, 0), 1, 1, facecolor='#D3D3D3', edgecolor='#34495E', label='Absent Day')
+                ]
             
             # Add the legend at the top (no title now)
-            fig.legend(handles=legend_elements, loc='upper center', bbox_to_anchor=(0.5, 0.92),
+            fig.legend(handles=TimeClockAnalyzer._LEGEND_HANDLES, loc='upper center',
+                      bbox_to_anchor=(0.5, 0.92),
                       ncol=4, fontsize=9, frameon=True, fancybox=True, shadow=True)
             
             # Enhanced layout and save
@@ -851,20 +1091,48 @@ class TimeClockAnalyzer:
                 ha='left', va='bottom',
                 fontsize=8, color='#2C3E50', style='italic')
         
-        # Save with 300 DPI (reduced from 400)
-        plt.savefig(output_filename, dpi=300, bbox_inches='tight', 
+        # Save with 300 DPI (reduced from 400). No bbox_inches='tight':
+        # that renders the figure twice (once just to measure), and the
+        # page geometry is already fixed at letter size with explicit
+        # subplots_adjust margins above
+        fig.savefig(output_filename, dpi=300,
                    facecolor='white', edgecolor='none', format='pdf')
         
-        # Don't show plot - just save
-        plt.close(fig)
+        # Don't close - the figure is reused for this worker's next page
     
     
-    def generate_heat_map(self):
+    def generate_heat_map(self, output_dir='.'):
         """Generate both detailed punch heat map and overall anomaly score heat map."""
-        self.generate_detailed_punch_heatmap()
-    
-    def generate_report(self):
-        """Generate detailed text report for management review."""
+        self.generate_detailed_punch_heatmap(output_dir=output_dir)
+
+    def _summary_frame(self):
+        """Flatten analysis_results into one summary row per (employee, period).
+
+        The nested dict keeps the anomaly detail lists; this frame carries
+        just the scalars, so report aggregation runs as pandas pivots and
+        groupbys instead of nested Python loops. Built lazily and cached
+        until the next run_analysis.
+        """
+        if self.scores_df is None:
+            self.scores_df = pd.DataFrame(
+                [
+                    (employee, label, result['score'], result['total_days'],
+                     result['worked_days'], result['missed_days'],
+                     len(result['anomalies']))
+                    for employee, periods in self.analysis_results.items()
+                    for label, result in periods.items()
+                ],
+                columns=['employee', 'period', 'score', 'total_days',
+                         'worked_days', 'missed_days', 'n_anomalies']
+            )
+        return self.scores_df
+
+    def generate_report(self, output_dir='.', return_text=True):
+        """Generate detailed text report for management review.
+
+        Pass return_text=False when the caller only needs the file on
+        disk - the joined report string is then never materialized.
+        """
         if not self.analysis_results:
             print("No analysis results to report")
             return
@@ -888,22 +1156,31 @@ class TimeClockAnalyzer:
         report.append(f"Period Range: {self.two_week_periods[0]['label']} to {self.two_week_periods[-1]['label']}")
         report.append("")
         
-        # Identify systematic offenders
-        systematic_offenders = []
-        for employee, periods in self.analysis_results.items():
-            high_score_periods = sum(1 for result in periods.values() if result['score'] >= 20)
-            total_anomalies = sum(len(result['anomalies']) for result in periods.values())
-            avg_score = np.mean([result['score'] for result in periods.values()])
-            
-            if high_score_periods >= 2 or avg_score >= 15:
-                systematic_offenders.append({
-                    'employee': employee,
-                    'avg_score': avg_score,
-                    'high_score_periods': high_score_periods,
-                    'total_anomalies': total_anomalies
-                })
-        
-        systematic_offenders.sort(key=lambda x: x['avg_score'], reverse=True)
+        # Identify systematic offenders: pivot the flat summary frame
+        # into (employee x period) matrices once, then let NumPy do the
+        # per-employee reductions instead of three Python passes each
+        summary = self._summary_frame()
+        score_tbl = summary.pivot(index='employee', columns='period', values='score')
+        offender_employees = score_tbl.index.tolist()
+        scores = score_tbl.to_numpy(dtype=np.float32)
+        n_anomalies = summary.pivot(
+            index='employee', columns='period', values='n_anomalies'
+        ).to_numpy(dtype=np.int32)
+
+        avg_scores = scores.mean(axis=1)
+        high_counts = (scores >= 20).sum(axis=1)
+        total_anomaly_counts = n_anomalies.sum(axis=1)
+
+        flagged = np.nonzero((high_counts >= 2) | (avg_scores >= 15))[0]
+        systematic_offenders = [
+            {
+                'employee': offender_employees[i],
+                'avg_score': avg_scores[i],
+                'high_score_periods': int(high_counts[i]),
+                'total_anomalies': int(total_anomaly_counts[i])
+            }
+            for i in flagged[np.argsort(-avg_scores[flagged])]
+        ]
         
         report.append("EMPLOYEES REQUIRING IMMEDIATE ATTENTION")
         report.append("-" * 50)
@@ -922,35 +1199,44 @@ class TimeClockAnalyzer:
         report.append("DETAILED PERIOD ANALYSIS")
         report.append("-" * 40)
         
+        # One groupby over the summary frame replaces a Python pass per
+        # period; the high-score listing comes from a single filtered sort
+        period_stats = summary.groupby('period', sort=False).agg(
+            avg_score=('score', 'mean'),
+            total_missed=('missed_days', 'sum'),
+        )
+        high_by_period = {
+            label: grp
+            for label, grp in summary[summary['score'] >= 20]
+            .sort_values('score', ascending=False)
+            .groupby('period', sort=False)
+        }
+
         for period in self.two_week_periods:
             period_label = period['label']
             report.append(f"\nPeriod: {period_label}")
             report.append("-" * 30)
             
-            # Collect all results for this period
-            period_results = []
-            for employee, periods in self.analysis_results.items():
-                if period_label in periods:
-                    period_results.append(periods[period_label])
-            
-            if not period_results:
+            if period_label not in period_stats.index:
                 report.append("No data for this period")
                 continue
             
-            # Period statistics
-            total_missed_days = sum(r['missed_days'] for r in period_results)
-            high_score_employees = [r for r in period_results if r['score'] >= 20]
-            avg_period_score = np.mean([r['score'] for r in period_results])
+            stats = period_stats.loc[period_label]
+            high_scores = high_by_period.get(period_label)
             
             report.append(f"Period Summary:")
-            report.append(f"  Average Anomaly Score: {avg_period_score:.1f}")
-            report.append(f"  Total Missed Days: {total_missed_days}")
-            report.append(f"  High-Risk Employees: {len(high_score_employees)}")
+            report.append(f"  Average Anomaly Score: {stats['avg_score']:.1f}")
+            report.append(f"  Total Missed Days: {int(stats['total_missed'])}")
+            report.append(f"  High-Risk Employees: {0 if high_scores is None else len(high_scores)}")
             
-            if high_score_employees:
+            if high_scores is not None:
                 report.append("  Employees with High Scores:")
-                for emp_result in sorted(high_score_employees, key=lambda x: x['score'], reverse=True):
-                    report.append(f"    • {emp_result['employee']}: {emp_result['score']} points")
+                # One extend with %-formatting over the zipped columns -
+                # no per-row append call or f-string parse in the loop
+                report.extend(map(
+                    "    • %s: %d points".__mod__,
+                    zip(high_scores['employee'], high_scores['score'])
+                ))
             
             report.append("")
         
@@ -958,30 +1244,49 @@ class TimeClockAnalyzer:
         report.append("ANOMALY TYPE BREAKDOWN")
         report.append("-" * 40)
         
-        anomaly_counts = defaultdict(int)
-        for employee_results in self.analysis_results.values():
-            for period_result in employee_results.values():
-                for anomaly in period_result['anomalies']:
-                    anomaly_counts[anomaly['type']] += 1
+        # Integer-code the type strings once, then tally with bincount
+        # and order with argsort instead of a hash-based counting pass
+        type_codes, type_names = pd.factorize(np.array([
+            anomaly['type']
+            for employee_results in self.analysis_results.values()
+            for period_result in employee_results.values()
+            for anomaly in period_result['anomalies']
+        ], dtype=object))
+        type_counts = np.bincount(type_codes, minlength=len(type_names))
         
-        for anomaly_type, count in sorted(anomaly_counts.items(), key=lambda x: x[1], reverse=True):
-            report.append(f"{anomaly_type.replace('_', ' ').title()}: {count}")
+        for i in np.argsort(-type_counts):
+            report.append(f"{type_names[i].replace('_', ' ').title()}: {type_counts[i]}")
         
         report.append("")
         report.append("=" * 80)
         report.append("END OF REPORT")
         report.append("=" * 80)
         
-        # Save report to file
-        report_text = "\n".join(report)
-        with open('timeclock_analysis_report.txt', 'w') as f:
-            f.write(report_text)
+        # Stream the lines straight to a buffered file handle instead of
+        # joining the whole report into one string first
+        with open(os.path.join(output_dir, 'timeclock_analysis_report.txt'), 'w',
+                  buffering=1 << 16) as f:
+            f.writelines(line + "\n" for line in report)
         
         print("Detailed report saved as 'timeclock_analysis_report.txt'")
         print("\nReport Preview:")
         print("\n".join(report[:50]))  # Show first 50 lines
         
-        return report_text
+        return "\n".join(report) if return_text else None
+
+def _analyze_one_employee(employee, emp_data, periods):
+    """Worker for the process pool: analyze one employee across all periods.
+
+    Runs in a child process, so it builds a throwaway analyzer (schedule
+    thresholds are constants set in __init__) and receives only the
+    employee's own sub-frame - the full DataFrame is never pickled.
+    """
+    analyzer = TimeClockAnalyzer('<worker>')
+    return employee, {
+        period['label']: analyzer.analyze_employee_period(employee, period, emp_data=emp_data)
+        for period in periods
+    }
+
 
 def main():
     """Main function to run the complete analysis."""
@@ -998,8 +1303,9 @@ def main():
         # Generate heat map
         analyzer.generate_heat_map()
         
-        # Generate detailed report
-        analyzer.generate_report()
+        # Generate detailed report (file only - the CLI never uses the
+        # returned text)
+        analyzer.generate_report(return_text=False)
         
         print("\nAnalysis complete!")
         print("Files generated:")